@@ -5,8 +5,10 @@ Optimized for reduced resource consumption
 
 import os
 import atexit
-import base64
-from flask import Flask, render_template, request, jsonify
+import tempfile
+import threading
+import concurrent.futures
+from flask import Flask, render_template, request, jsonify, Response, stream_with_context, send_from_directory
 
 # Import services (now in the same directory)
 from translation_service import TranslationService, TranslationError
@@ -18,26 +20,87 @@ app = Flask(__name__)
 app.config['MAX_CONTENT_LENGTH'] = 16 * 1024 * 1024  # 16MB max request size
 app.config['JSON_SORT_KEYS'] = False
 
-# Services initialized on first use
+# Route request/response JSON through orjson when available: its
+# Rust/SIMD parser and serializer are several times faster than the
+# stdlib for request.json and jsonify, with no call-site changes
+try:
+    import orjson
+    from flask.json.provider import JSONProvider
+
+    class ORJSONProvider(JSONProvider):
+        """Flask JSON provider backed by orjson"""
+
+        def dumps(self, obj, **kwargs):
+            return orjson.dumps(obj).decode('utf-8')
+
+        def loads(self, s, **kwargs):
+            return orjson.loads(s)
+
+    app.json = ORJSONProvider(app)
+except ImportError:
+    pass  # Stdlib json provider remains the default
+
+# Generated audio is request-scoped and short-lived, so keep it on
+# tmpfs where available instead of persistent disk; MeloTTSService
+# bounds the file count either way
+if os.environ.get('AUDIO_OUTPUT_DIR'):
+    AUDIO_OUTPUT_DIR = os.environ['AUDIO_OUTPUT_DIR']
+elif os.path.isdir('/dev/shm'):
+    AUDIO_OUTPUT_DIR = '/dev/shm/tts_audio'
+else:
+    AUDIO_OUTPUT_DIR = os.path.join(tempfile.gettempdir(), 'tts_audio')
+
+# Services initialized on first use (double-checked under their locks,
+# since concurrent first requests in a threaded worker could otherwise
+# both construct a service)
 _translation_service = None
+_translation_lock = threading.Lock()
 _tts_service = None
+_tts_lock = threading.Lock()
+
+# Single thread for overlapping TTS model loading with translation
+_warmup_executor = concurrent.futures.ThreadPoolExecutor(max_workers=1)
 
 def get_translation_service():
     """Lazy initialization of translation service"""
     global _translation_service
     if _translation_service is None:
-        print("Initializing translation service...")
-        _translation_service = TranslationService()
+        with _translation_lock:
+            if _translation_service is None:
+                print("Initializing translation service...")
+                _translation_service = TranslationService()
     return _translation_service
 
 def get_tts_service():
     """Lazy initialization of TTS service"""
     global _tts_service
     if _tts_service is None:
-        print("Initializing TTS service (model will load on first request)...")
-        _tts_service = MeloTTSService()
+        with _tts_lock:
+            if _tts_service is None:
+                print("Initializing TTS service (model will load on first request)...")
+                _tts_service = MeloTTSService(output_dir=AUDIO_OUTPUT_DIR)
+                if os.environ.get('TTS_WARMUP') == '1':
+                    # Load the model and precompute features for hot
+                    # phrases on a dedicated thread: going through
+                    # _warmup_executor would queue every request's
+                    # warmup.result() behind the whole hot-phrase sweep
+                    threading.Thread(
+                        target=_warm_tts_from_translation_cache,
+                        name='tts-feature-warmup',
+                        daemon=True
+                    ).start()
     return _tts_service
 
+def _warm_tts_from_translation_cache():
+    """Precompute TTS text features for recently translated phrases"""
+    try:
+        hot_texts = get_translation_service().cached_translations(limit=128)
+        if hot_texts:
+            warmed = get_tts_service().warm_feature_cache(hot_texts)
+            print(f"Warmed TTS features for {warmed} cached sentence pieces")
+    except Exception as e:
+        print(f"TTS feature warmup skipped: {e}")
+
 def cleanup_services():
     """Cleanup services on shutdown"""
     global _translation_service, _tts_service
@@ -81,59 +144,118 @@ def convert():
     if not thai_text:
         return jsonify({'error': 'No text provided'}), 400
 
+    # Warm the TTS model in the background so a cold model loads while
+    # the translation's network round-trip is in flight (no-op once warm)
+    warmup = _warmup_executor.submit(lambda: tts_service.model)
+
     # 1. Translate Thai -> Chinese
     try:
         chinese_text, mechanism = translation_service.translate(thai_text)
     except TranslationError as e:
         return jsonify({'error': f'Translation failed: {str(e)}'}), 500
 
-    # 2. TTS with MeloTTS (now returns MP3 or WAV with format indicator)
+    # 2. TTS with MeloTTS, written under static/audio and served by URL
+    # (keeps the JSON response small instead of embedding base64 audio)
     try:
-         audio_bytes, audio_format = tts_service.generate_speech(chinese_text, speed=speed)
-         
-         # Convert audio bytes to base64 data URL with correct MIME type
-         audio_base64 = base64.b64encode(audio_bytes).decode('utf-8')
-         
-         # Set MIME type based on actual format
-         mime_type = 'audio/mpeg' if audio_format == 'mp3' else 'audio/wav'
-         audio_data_url = f'data:{mime_type};base64,{audio_base64}'
-         
+         warmup.result()  # Ensure the model finished loading
+         filename, audio_format = tts_service.generate_speech_to_file(chinese_text, speed=speed)
+
          # Return result
          return jsonify({
              'thai': thai_text,
              'chinese': chinese_text,
-             'audio_url': audio_data_url,
+             'audio_url': f'/static/audio/{filename}',
              'audio_format': audio_format,  # 'mp3' or 'wav'
              'translator': mechanism,
              'tts_engine': 'MeloTTS',
              'speed': speed
          })
-         
+
     except TTSError as e:
         return jsonify({'error': f'TTS generation failed: {str(e)}'}), 500
 
+@app.route('/static/audio/<path:filename>')
+def serve_audio(filename):
+    """
+    Serve generated audio from the (tmpfs-backed) output directory.
+
+    Filenames are unique per synthesis, so responses are effectively
+    content-addressed: mark them immutable and let retries hit the
+    browser cache (or answer 304 via the conditional handler) instead
+    of re-reading the file.
+    """
+    response = send_from_directory(
+        AUDIO_OUTPUT_DIR, filename, conditional=True, max_age=3600
+    )
+    response.headers['Cache-Control'] = 'public, max-age=3600, immutable'
+    return response
+
+@app.route('/api/convert/stream', methods=['POST'])
+def convert_stream():
+    """
+    Streaming variant of /api/convert: responds with chunked audio
+    (audio/mpeg) so playback can start after the first sentence piece
+    instead of after the whole synthesis.
+    """
+    translation_service = get_translation_service()
+    tts_service = get_tts_service()
+
+    data = request.json
+    thai_text = data.get('text', '').strip()
+    speed = data.get('speed', 1.0)
+
+    try:
+        speed = float(speed)
+        speed = max(0.5, min(2.0, speed))
+    except (ValueError, TypeError):
+        speed = 1.0
+
+    if not thai_text:
+        return jsonify({'error': 'No text provided'}), 400
+
+    # Overlap model warmup with the translation round-trip (no-op once warm)
+    warmup = _warmup_executor.submit(lambda: tts_service.model)
+
+    # Translate before streaming starts so errors can still return JSON
+    try:
+        chinese_text, _ = translation_service.translate(thai_text)
+    except TranslationError as e:
+        return jsonify({'error': f'Translation failed: {str(e)}'}), 500
+
+    warmup.result()  # Ensure the model finished loading
+
+    audio_format = tts_service.stream_format()
+    mime_type = 'audio/mpeg' if audio_format == 'mp3' else 'audio/wav'
+    return Response(
+        stream_with_context(
+            tts_service.generate_speech_stream(chinese_text, speed=speed)
+        ),
+        mimetype=mime_type
+    )
+
+# Health responses only change when a service transitions lazy ->
+# initialized, so cache the serialized body keyed by that state
+_health_cache = (None, None)
+
 @app.route('/api/health', methods=['GET'])
 def health():
     """Health check endpoint"""
-    return jsonify({
-        'status': 'healthy',
-        'translation_service': 'initialized' if _translation_service else 'lazy',
-        'tts_service': 'initialized' if _tts_service else 'lazy'
-    })
+    global _health_cache
+    state = (_translation_service is not None, _tts_service is not None)
+    cached_state, payload = _health_cache
+    if state != cached_state:
+        payload = jsonify({
+            'status': 'healthy',
+            'translation_service': 'initialized' if state[0] else 'lazy',
+            'tts_service': 'initialized' if state[1] else 'lazy'
+        }).get_data()
+        _health_cache = (state, payload)
+    return Response(payload, mimetype='application/json')
 
 if __name__ == '__main__':
-    import sys
-    
-    # Check if running in debug mode
-    debug_mode = '--debug' in sys.argv
-    
-    print(f"Starting Thai-Chinese TTS Web Application...")
-    print(f"Debug mode: {debug_mode}")
-    print(f"Services will initialize on first request (lazy loading)")
-    
-    app.run(
-        debug=debug_mode,
-        host='0.0.0.0',
-        port=5001,
-        threaded=True
-    )
\ No newline at end of file
+    # The Flask dev server (even with threaded=True) cannot parallelize
+    # TTS inference because MeloTTS holds the GIL. Serve with Gunicorn
+    # so concurrent requests run in separate worker processes:
+    print("Run with Gunicorn instead:")
+    print("    gunicorn -c gunicorn_conf.py app:app")
+    print("Each worker lazy-loads its own TTS model on first request.")
\ No newline at end of file
@@ -0,0 +1,78 @@
+"""
+Gunicorn configuration for the Thai-Chinese TTS web app.
+
+MeloTTS inference is compute-bound and holds the GIL, so it only
+parallelizes across worker processes: each worker lazy-loads its own
+model copy on first request (preload_app stays False to avoid sharing
+a model across fork, which breaks CUDA).
+
+The translate stage, by contrast, is network-bound and releases the
+GIL, so each worker also runs a small thread pool (gthread): concurrent
+requests overlap their translation round-trips and queue fairly at the
+per-worker TTS batch scheduler instead of head-of-line blocking.
+
+Run with: gunicorn -c gunicorn_conf.py app:app
+"""
+
+import os
+import tempfile
+
+bind = '0.0.0.0:5001'
+
+# Resolve the audio output directory once (same precedence as app.py)
+# and export it so every worker and the startup sweep agree on one path
+if os.environ.get('AUDIO_OUTPUT_DIR'):
+    _audio_output_dir = os.environ['AUDIO_OUTPUT_DIR']
+elif os.path.isdir('/dev/shm'):
+    _audio_output_dir = '/dev/shm/tts_audio'
+else:
+    _audio_output_dir = os.path.join(tempfile.gettempdir(), 'tts_audio')
+os.environ['AUDIO_OUTPUT_DIR'] = _audio_output_dir
+
+# One process per ~2 cores; each worker holds a full model copy in memory
+workers = max(2, (os.cpu_count() or 2) // 2)
+
+# Threads overlap network-bound stages (translation) within a worker;
+# the TTS batch scheduler serializes and batches model access anyway
+worker_class = 'gthread'
+threads = 4
+
+# TTS synthesis of long texts can take a while on CPU
+timeout = 120
+
+# Each worker must lazy-load its own model (no fork-after-load)
+preload_app = False
+
+def post_worker_init(worker):
+    """
+    With TTS_WARMUP=1, create the TTS service as soon as the worker
+    boots: creation starts the background thread that loads the model
+    and precomputes features for cached translations, so the first
+    request no longer pays for either. Without the flag, workers keep
+    lazy-loading on first request.
+    """
+    if os.environ.get('TTS_WARMUP') == '1':
+        from app import get_tts_service
+        get_tts_service()
+
+def on_starting(server):
+    """
+    Sweep audio files stranded by previous runs before any worker boots.
+    Each worker's eviction ring starts empty, so files written by
+    earlier processes would otherwise sit in tmpfs (i.e. RAM) until the
+    host reboots.
+    """
+    try:
+        names = os.listdir(_audio_output_dir)
+    except FileNotFoundError:
+        return
+    removed = 0
+    for name in names:
+        if name.startswith('melo_tts_'):
+            try:
+                os.unlink(os.path.join(_audio_output_dir, name))
+                removed += 1
+            except OSError:
+                pass
+    if removed:
+        print(f"Removed {removed} stale audio files from {_audio_output_dir}")
@@ -7,7 +7,16 @@ Optimized with lazy loading and automatic cleanup
 import os
 import sys
 import io
-import tempfile
+import time
+import queue
+import shutil
+import threading
+import itertools
+import contextlib
+import collections
+import subprocess
+import concurrent.futures
+from functools import lru_cache
 from pathlib import Path
 
 # Fix OpenMP conflict on Windows
@@ -15,49 +24,336 @@ os.environ['KMP_DUPLICATE_LIB_OK'] = 'TRUE'
 
 from typing import Dict, Optional, List, Tuple
 
+import torch
+import numpy as np
+import soundfile
 from melo.api import TTS
+from melo import utils as melo_utils
 
 try:
-    from pydub import AudioSegment
-    PYDUB_AVAILABLE = True
+    import lameenc
+    LAMEENC_AVAILABLE = True
 except ImportError:
-    PYDUB_AVAILABLE = False
-    print("Warning: pydub not available, MP3 conversion disabled")
+    LAMEENC_AVAILABLE = False
+
+FFMPEG_AVAILABLE = shutil.which('ffmpeg') is not None
+if not (LAMEENC_AVAILABLE or FFMPEG_AVAILABLE):
+    print("Warning: neither lameenc nor ffmpeg available, MP3 conversion disabled (WAV fallback)")
+
+
+class BatchScheduler:
+    """Cross-request dynamic batching for MeloTTS inference.
+
+    A single scheduler thread owns the TTS model. Concurrent
+    generate_speech calls enqueue (text, speaker_id, speed, future);
+    the loop drains up to MAX_BATCH items (waiting at most MAX_WAIT_MS
+    for stragglers), buckets them by (speaker_id, speed) since speed
+    scales the duration predictor per batch, pads phoneme sequences to
+    the longest in the bucket, runs one forward pass, then slices each
+    caller's audio back out using the unpadded output lengths.
+    """
+
+    MAX_BATCH = 8
+    MAX_WAIT_MS = 20
+    FEATURE_CACHE_SIZE = 128  # Unique sentence pieces with cached G2P/BERT features
+
+    # Defaults matching melo.api.TTS.tts_to_file
+    SDP_RATIO = 0.2
+    NOISE_SCALE = 0.6
+    NOISE_SCALE_W = 0.8
+
+    def __init__(self, model):
+        self._model = model
+        # G2P + BERT encoding dominates repeat-input latency; cache the
+        # resulting tensors per unique sentence piece. The scheduler
+        # thread and warm_feature_cache both populate it; lru_cache's
+        # internal lock makes that safe (a piece is at worst computed
+        # twice, never corrupted)
+        self.text_features = lru_cache(maxsize=self.FEATURE_CACHE_SIZE)(
+            self._text_features_impl
+        )
+        self._autocast_dtype = self._pick_autocast_dtype(model.device)
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(
+            target=self._loop, name='melo-batch-scheduler', daemon=True
+        )
+        self._thread.start()
+
+    @staticmethod
+    def _pick_autocast_dtype(device) -> Optional[torch.dtype]:
+        """
+        Mixed-precision dtype for inference, or None to stay in FP32.
+        Halves activation memory traffic while keeping weights (and the
+        text encoder numerics) in FP32. Default on for CUDA, opt out
+        with MELO_AUTOCAST=0 if half precision audibly degrades the
+        vocoder; opt-in via MELO_AUTOCAST_BF16=1 on CPU, where it only
+        pays off with native bfloat16 support (AVX-512 BF16 / recent ARM).
+        """
+        if os.environ.get('MELO_AUTOCAST', '1') == '0':
+            return None
+        if str(device).startswith('cuda'):
+            return torch.bfloat16 if torch.cuda.is_bf16_supported() else torch.float16
+        if os.environ.get('MELO_AUTOCAST_BF16') == '1':
+            return torch.bfloat16
+        return None
+
+    def submit(self, text: str, speaker_id: int, speed: float) -> concurrent.futures.Future:
+        """Enqueue a synthesis request; resolves to a float32 numpy waveform"""
+        future = concurrent.futures.Future()
+        self._queue.put((text, speaker_id, speed, future))
+        return future
+
+    def shutdown(self):
+        """Stop the scheduler thread"""
+        self._queue.put(None)
+        self._thread.join(timeout=5)
+
+    def _loop(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+
+            # Collect a batch: wait a short window for concurrent arrivals
+            batch = [item]
+            deadline = time.monotonic() + self.MAX_WAIT_MS / 1000.0
+            while len(batch) < self.MAX_BATCH:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    nxt = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if nxt is None:
+                    self._queue.put(None)  # re-post sentinel for the outer loop
+                    break
+                batch.append(nxt)
+
+            # All items in one forward pass must share speaker and speed
+            buckets = {}
+            for text, speaker_id, speed, future in batch:
+                buckets.setdefault((speaker_id, speed), []).append((text, future))
+
+            for (speaker_id, speed), items in buckets.items():
+                self._run_bucket(items, speaker_id, speed)
+
+    def _run_bucket(self, items, speaker_id: int, speed: float):
+        try:
+            audios = self._infer_batch([text for text, _ in items], speaker_id, speed)
+        except Exception as batch_error:
+            # Batched path failed; retry per-item so one bad input
+            # cannot poison the whole batch. Log it so a persistent
+            # failure (degrading every request to batch size 1) is
+            # visible to operators
+            print(f"Batched inference failed ({batch_error}), retrying items individually")
+            for text, future in items:
+                try:
+                    audio = self._model.tts_to_file(
+                        text=text,
+                        speaker_id=speaker_id,
+                        output_path=None,
+                        speed=speed,
+                        quiet=True
+                    )
+                    future.set_result(audio)
+                except Exception as e:
+                    future.set_exception(e)
+            return
+
+        for (text, future), audio in zip(items, audios):
+            future.set_result(audio)
+
+    def _text_features_impl(self, piece: str):
+        """G2P + BERT features for one sentence piece"""
+        model = self._model
+        return melo_utils.get_text_for_tts_infer(
+            piece, model.language, model.hps, model.device, model.symbol_to_id
+        )
+
+    def _infer_batch(self, texts: List[str], speaker_id: int, speed: float) -> List[np.ndarray]:
+        """Run one padded forward pass over all sentence pieces of all texts"""
+        model = self._model
+        hps = model.hps
+        device = model.device
+
+        # Split each request like tts_to_file does, then batch all pieces
+        pieces_per_text = [
+            model.split_sentences_into_pieces(text, model.language, quiet=True)
+            for text in texts
+        ]
+        flat_pieces = [piece for pieces in pieces_per_text for piece in pieces]
+
+        features = [self.text_features(piece) for piece in flat_pieces]
+
+        batch_size = len(features)
+        lengths = [feat[2].size(0) for feat in features]
+        max_len = max(lengths)
+
+        # Pad every sequence to the longest in the batch; the model masks
+        # padding via x_lengths
+        bert = torch.zeros(batch_size, features[0][0].size(0), max_len, device=device)
+        ja_bert = torch.zeros(batch_size, features[0][1].size(0), max_len, device=device)
+        phones = torch.zeros(batch_size, max_len, dtype=torch.long, device=device)
+        tones = torch.zeros(batch_size, max_len, dtype=torch.long, device=device)
+        lang_ids = torch.zeros(batch_size, max_len, dtype=torch.long, device=device)
+
+        for i, (b, jb, ph, tn, lid) in enumerate(features):
+            n = lengths[i]
+            bert[i, :, :n] = b
+            ja_bert[i, :, :n] = jb
+            phones[i, :n] = ph
+            tones[i, :n] = tn
+            lang_ids[i, :n] = lid
+
+        x_lengths = torch.LongTensor(lengths).to(device)
+        speakers = torch.LongTensor([speaker_id] * batch_size).to(device)
+
+        device_type = 'cuda' if str(device).startswith('cuda') else 'cpu'
+        autocast = (
+            torch.autocast(device_type=device_type, dtype=self._autocast_dtype)
+            if self._autocast_dtype is not None
+            else contextlib.nullcontext()
+        )
+        with torch.inference_mode(), autocast:
+            output = model.model.infer(
+                phones,
+                x_lengths,
+                speakers,
+                tones,
+                lang_ids,
+                bert,
+                ja_bert,
+                sdp_ratio=self.SDP_RATIO,
+                noise_scale=self.NOISE_SCALE,
+                noise_scale_w=self.NOISE_SCALE_W,
+                length_scale=1.0 / speed,
+            )
+            audio_batch = output[0]  # [B, 1, T], padded
+            y_mask = output[2]       # [B, 1, T_mel]
+
+        # De-pad: per-sample audio length is mel frames * hop length
+        hop_length = hps.data.hop_length
+        flat_audios = []
+        for i in range(batch_size):
+            n_samples = int(y_mask[i].sum().item()) * hop_length
+            flat_audios.append(
+                audio_batch[i, 0, :n_samples].data.cpu().float().numpy()
+            )
+
+        # Reassemble each request's pieces into one waveform
+        audios = []
+        index = 0
+        for pieces in pieces_per_text:
+            segments = flat_audios[index:index + len(pieces)]
+            index += len(pieces)
+            audios.append(
+                model.audio_numpy_concat(
+                    segments, sr=hps.data.sampling_rate, speed=speed
+                )
+            )
+        return audios
 
 
 class MeloTTSService:
     """Chinese Text-to-Speech Service using MeloTTS with Lazy Loading"""
-    
-    def __init__(self, device: str = 'auto'):
+
+    AUDIO_CACHE_BYTES_LIMIT = 64 << 20  # 64 MB of encoded repeat-request audio
+    MAX_OUTPUT_FILES = 256  # Bound on audio files kept in output_dir
+
+    def __init__(self, device: str = 'auto', output_dir: Optional[str] = None):
         """
         Initialize MeloTTS service
-        
+
         Args:
             device: 'auto', 'cpu', 'cuda', or 'mps'
+            output_dir: Directory for generate_speech_to_file output
         """
         self.device = device
-        
-        # Lazy initialization
+        self.output_dir = output_dir
+
+        # Ring of written files: each write may evict the oldest, so
+        # cleanup is amortized O(1) per request with no background thread
+        self._recent_files = collections.deque()
+        self._recent_files_lock = threading.Lock()
+
+        # Monotonic per-process counter makes filenames unique across
+        # threads; the PID makes them unique across workers
+        self._filename_counter = itertools.count()
+
+        # Lazy initialization (double-checked under _model_lock)
         self._model = None
+        self._model_lock = threading.Lock()
         self._speaker_ids = None
         self._speakers = None
         self._voices = None
+        self._voice_labels = None
+        self._scheduler = None
+
+        # LRU of final encoded audio keyed by (text, speed, speaker_id);
+        # a repeat request skips synthesis and encoding entirely
+        self._audio_cache = collections.OrderedDict()
+        self._audio_cache_bytes = 0
+        self._audio_cache_lock = threading.Lock()
     
     @property
     def model(self):
-        """Lazy initialization of MeloTTS model"""
+        """Lazy initialization of MeloTTS model (double-checked locking)"""
         if self._model is None:
-            print("Loading MeloTTS Chinese model...")
-            self._model = TTS(language='ZH', device=self.device)
-            
-            # Get available speakers from model
-            self._speaker_ids = self._model.hps.data.spk2id
-            self._speakers = list(self._speaker_ids.keys())
-            
-            # Create voice mapping for API compatibility
-            self._voices = self._build_voice_mapping()
-            print(f"MeloTTS loaded. Available speakers: {self._speakers}")
+            with self._model_lock:
+                if self._model is None:
+                    self._load_model()
         return self._model
+
+    def _load_model(self):
+        """Load and prepare the model; caller must hold _model_lock"""
+        print("Loading MeloTTS Chinese model...")
+        model = TTS(language='ZH', device=self.device)
+
+        # Get available speakers from model
+        self._speaker_ids = model.hps.data.spk2id
+        self._speakers = list(self._speaker_ids.keys())
+
+        # Create voice mapping for API compatibility
+        self._voices = self._build_voice_mapping()
+
+        # On CPU, dynamically quantize the matmul-heavy text encoder
+        # and duration predictors to int8 (VNNI / NEON dot-product
+        # GEMMs); the vocoder and flow stay FP32 since quantization
+        # audibly degrades them. Opt out with MELO_INT8=0.
+        if (os.environ.get('MELO_INT8', '1') != '0'
+                and not str(model.device).startswith(('cuda', 'mps'))):
+            try:
+                net = model.model
+                for name in ('enc_p', 'dp', 'sdp'):
+                    submodule = getattr(net, name, None)
+                    if submodule is not None:
+                        setattr(net, name, torch.quantization.quantize_dynamic(
+                            submodule, {torch.nn.Linear}, dtype=torch.qint8
+                        ))
+                print("Quantized MeloTTS text encoder/duration predictors to int8")
+            except Exception as e:
+                print(f"int8 quantization failed ({e}), continuing in FP32")
+
+        # Opt-in kernel fusion for the compute-heavy submodules that
+        # infer() actually forwards through (decoder and flow); the
+        # one-time compile cost is paid on the first request
+        if os.environ.get('MELO_COMPILE') == '1' and hasattr(torch, 'compile'):
+            try:
+                net = model.model
+                net.dec = torch.compile(net.dec, mode='reduce-overhead', fullgraph=False)
+                net.flow = torch.compile(net.flow, mode='reduce-overhead', fullgraph=False)
+                print("MeloTTS decoder/flow compiled with torch.compile")
+            except Exception as e:
+                print(f"torch.compile failed ({e}), continuing uncompiled")
+
+        # Single scheduler thread owns the model and batches
+        # concurrent requests
+        self._scheduler = BatchScheduler(model)
+
+        # Publish last so concurrent readers never see a half-prepared model
+        self._model = model
+        print(f"MeloTTS loaded. Available speakers: {self._speakers}")
     
     def _build_voice_mapping(self) -> Dict[str, Dict[str, str]]:
         """Build voice mapping from MeloTTS speakers"""
@@ -78,7 +374,13 @@ class MeloTTSService:
                 'label': label,
                 'speaker_id': self._speaker_ids[speaker]
             }
-        
+
+        # Labels never change after load, so format them once here
+        # instead of on every get_voice_labels call
+        self._voice_labels = tuple(
+            f"{key}. {v['label']}" for key, v in voices.items()
+        )
+
         return voices
     
     def get_voices(self) -> Dict[str, Dict[str, str]]:
@@ -88,9 +390,12 @@ class MeloTTSService:
             _ = self.model
         return self._voices
     
-    def get_voice_labels(self) -> List[str]:
-        """Get formatted voice labels for display"""
-        return [f"{key}. {v['label']}" for key, v in self._voices.items()]
+    def get_voice_labels(self) -> Tuple[str, ...]:
+        """Get formatted voice labels for display (precomputed at model load)"""
+        if self._voice_labels is None:
+            # Trigger model loading
+            _ = self.model
+        return self._voice_labels
     
     def get_voice_name(self, choice: str) -> Optional[str]:
         """Get voice name from choice number"""
@@ -123,81 +428,307 @@ class MeloTTSService:
         """
         if not text.strip():
             raise TTSError("Text cannot be empty")
-        
+
         # Trigger model loading if needed
         model = self.model
-        
+
         # Use first (and only) Chinese speaker
         speaker_id = self._speaker_ids[self._speakers[0]]
-        
-        tmp_wav_path = None
-        tmp_mp3_path = None
-        
+
+        # Repeat requests return the previously encoded bytes without
+        # touching the model
+        cache_key = (text, speed, speaker_id)
+        with self._audio_cache_lock:
+            if cache_key in self._audio_cache:
+                self._audio_cache.move_to_end(cache_key)
+                return self._audio_cache[cache_key]
+
+        # Synthesize through the batch scheduler: concurrent requests
+        # arriving within its window share a single forward pass
         try:
-            # Create a temporary WAV file to capture MeloTTS output
-            with tempfile.NamedTemporaryFile(suffix='.wav', delete=False) as tmp_file:
-                tmp_wav_path = tmp_file.name
-            
-            # Generate speech with MeloTTS to temp WAV file
-            model.tts_to_file(
-                text=text,
-                speaker_id=speaker_id,
-                output_path=tmp_wav_path,
-                speed=speed,
-                quiet=True
-            )
-            
-            # Try to convert WAV to MP3 using pydub
-            if PYDUB_AVAILABLE:
-                try:
-                    # Load WAV file
-                    audio = AudioSegment.from_wav(tmp_wav_path)
-                    
-                    # Create temporary MP3 file
-                    with tempfile.NamedTemporaryFile(suffix='.mp3', delete=False) as tmp_file:
-                        tmp_mp3_path = tmp_file.name
-                    
-                    # Export as MP3 (bitrate 192k for good quality)
-                    audio.export(tmp_mp3_path, format='mp3', bitrate='192k')
-                    
-                    # Read MP3 file into memory
-                    with open(tmp_mp3_path, 'rb') as f:
-                        audio_bytes = f.read()
-                    
-                    audio_format = 'mp3'
-                    print("Successfully converted to MP3")
-                    
-                except Exception as conv_error:
-                    # Fallback to WAV if conversion fails (e.g., ffmpeg not installed)
-                    print(f"MP3 conversion failed ({conv_error}), falling back to WAV")
-                    with open(tmp_wav_path, 'rb') as f:
-                        audio_bytes = f.read()
-                    audio_format = 'wav'
-            else:
-                # Fallback to WAV if pydub not available
-                print("pydub not available, returning WAV format")
-                with open(tmp_wav_path, 'rb') as f:
-                    audio_bytes = f.read()
-                audio_format = 'wav'
-            
-            return audio_bytes, audio_format
-            
+            future = self._scheduler.submit(text, speaker_id, speed)
+            audio = future.result(timeout=120)
         except Exception as e:
             raise TTSError(f"Failed to generate speech: {e}")
+
+        result = self._encode(audio, model.hps.data.sampling_rate)
+        self._cache_audio(cache_key, result)
+        return result
+
+    def _encode(self, audio: np.ndarray, sample_rate: int) -> Tuple[bytes, str]:
+        """
+        Encode a waveform to (bytes, format), preferring the in-process
+        libmp3lame encoder (no fork + pipe), then the ffmpeg pipe, then
+        in-memory WAV.
+        """
+        if LAMEENC_AVAILABLE:
+            try:
+                return self._encode_mp3_lame(audio, sample_rate), 'mp3'
+            except Exception as conv_error:
+                print(f"lameenc encoding failed ({conv_error}), trying ffmpeg")
+        if FFMPEG_AVAILABLE:
+            try:
+                return self._encode_mp3(audio, sample_rate), 'mp3'
+            except Exception as conv_error:
+                print(f"MP3 conversion failed ({conv_error}), falling back to WAV")
+
+        # Fallback: in-memory WAV
+        buffer = io.BytesIO()
+        soundfile.write(buffer, audio, sample_rate, format='WAV')
+        return buffer.getvalue(), 'wav'
+
+    def _cache_audio(self, key, result: Tuple[bytes, str]):
+        """Insert encoded audio, evicting least-recently-used past the byte limit"""
+        with self._audio_cache_lock:
+            if key in self._audio_cache:
+                return
+            self._audio_cache[key] = result
+            self._audio_cache_bytes += len(result[0])
+            while self._audio_cache_bytes > self.AUDIO_CACHE_BYTES_LIMIT and self._audio_cache:
+                _, (evicted_bytes, _) = self._audio_cache.popitem(last=False)
+                self._audio_cache_bytes -= len(evicted_bytes)
+
+    @staticmethod
+    def _to_int16(audio: np.ndarray) -> np.ndarray:
+        """Convert a float waveform in [-1, 1] to int16 PCM"""
+        return (np.clip(audio, -1.0, 1.0) * 32767.0).astype(np.int16)
+
+    @staticmethod
+    def _new_lame_encoder(sample_rate: int):
+        """Build a libmp3lame encoder matching the ffmpeg settings (192k mono)"""
+        encoder = lameenc.Encoder()
+        encoder.set_bit_rate(192)
+        encoder.set_in_sample_rate(sample_rate)
+        encoder.set_channels(1)
+        encoder.set_quality(2)
+        return encoder
+
+    @classmethod
+    def _encode_mp3_lame(cls, audio: np.ndarray, sample_rate: int) -> bytes:
+        """Encode a float32 waveform to MP3 bytes in-process via lameenc"""
+        encoder = cls._new_lame_encoder(sample_rate)
+        pcm = cls._to_int16(audio)
+        return bytes(encoder.encode(pcm.tobytes())) + bytes(encoder.flush())
+
+    @staticmethod
+    def _encode_mp3(audio: np.ndarray, sample_rate: int) -> bytes:
+        """Encode a float32 waveform to MP3 bytes by piping PCM through ffmpeg"""
+        proc = subprocess.Popen(
+            ['ffmpeg', '-v', 'quiet',
+             '-f', 'f32le', '-ar', str(sample_rate), '-ac', '1', '-i', 'pipe:0',
+             '-b:a', '192k', '-f', 'mp3', 'pipe:1'],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE
+        )
+        mp3_bytes, _ = proc.communicate(audio.astype(np.float32).tobytes())
+        if proc.returncode != 0 or not mp3_bytes:
+            raise RuntimeError(f"ffmpeg exited with code {proc.returncode}")
+        return mp3_bytes
+
+    def warm_feature_cache(self, texts: List[str]) -> int:
+        """
+        Precompute G2P/BERT features for known-hot Chinese texts so
+        their first synthesis skips the text encoder stage and only
+        pays for the vocoder pass.
+
+        Args:
+            texts: Chinese texts to warm (e.g. recent translations)
+
+        Returns:
+            Number of sentence pieces warmed
+        """
+        # Trigger model loading if needed
+        model = self.model
+
+        warmed = 0
+        for text in texts:
+            try:
+                pieces = model.split_sentences_into_pieces(
+                    text, model.language, quiet=True
+                )
+                for piece in pieces:
+                    self._scheduler.text_features(piece)
+                    warmed += 1
+            except Exception as e:
+                print(f"Feature warmup failed for {text!r}: {e}")
+        return warmed
+
+    def generate_speech_to_file(self, text: str, speed: float = 1.0) -> Tuple[str, str]:
+        """
+        Generate speech and write it into output_dir, rotating out the
+        oldest file once MAX_OUTPUT_FILES is exceeded.
+
+        Args:
+            text: Chinese text to synthesize
+            speed: Speech speed (0.5-2.0)
+
+        Returns:
+            Tuple of (filename, format) where format is 'mp3' or 'wav'
+        """
+        if self.output_dir is None:
+            raise TTSError("No output directory configured")
+
+        audio_bytes, audio_format = self.generate_speech(text, speed=speed)
+
+        os.makedirs(self.output_dir, exist_ok=True)
+        filename = (
+            f"melo_tts_{os.getpid():x}_{int(time.time() * 1000):x}"
+            f"_{next(self._filename_counter):x}.{audio_format}"
+        )
+        path = os.path.join(self.output_dir, filename)
+        with open(path, 'wb') as f:
+            f.write(audio_bytes)
+
+        self._register_output_file(path)
+        return filename, audio_format
+
+    def _register_output_file(self, path: str):
+        """Track a written file; unlink the oldest beyond MAX_OUTPUT_FILES"""
+        with self._recent_files_lock:
+            self._recent_files.append(path)
+            evicted = None
+            if len(self._recent_files) > self.MAX_OUTPUT_FILES:
+                evicted = self._recent_files.popleft()
+        if evicted is not None:
+            try:
+                os.unlink(evicted)
+            except FileNotFoundError:
+                pass
+
+    def stream_format(self) -> str:
+        """Format produced by generate_speech_stream ('mp3' or 'wav')"""
+        return 'mp3' if (LAMEENC_AVAILABLE or FFMPEG_AVAILABLE) else 'wav'
+
+    def generate_speech_stream(self, text: str, speed: float = 1.0):
+        """
+        Generate speech from Chinese text as a stream of MP3 chunks.
+
+        Each sentence piece is synthesized and encoded as soon as it is
+        ready, so the first bytes reach the client after one piece
+        instead of after the whole utterance. Requires ffmpeg; falls
+        back to yielding a single whole WAV if it is unavailable.
+
+        Args:
+            text: Chinese text to synthesize
+            speed: Speech speed (0.5-2.0)
+
+        Yields:
+            Chunks of encoded audio bytes
+        """
+        if not text.strip():
+            raise TTSError("Text cannot be empty")
+
+        # Trigger model loading if needed
+        model = self.model
+        speaker_id = self._speaker_ids[self._speakers[0]]
+        sample_rate = model.hps.data.sampling_rate
+
+        if not (LAMEENC_AVAILABLE or FFMPEG_AVAILABLE):
+            # No incremental encoder available: synthesize everything
+            # and yield it in one piece
+            audio_bytes, _ = self.generate_speech(text, speed=speed)
+            yield audio_bytes
+            return
+
+        # Sentence pieces are natural chunk boundaries, so no overlap
+        # window is needed between them
+        pieces = model.split_sentences_into_pieces(text, model.language, quiet=True)
+
+        if LAMEENC_AVAILABLE:
+            # In-process incremental encoding: one encoder instance spans
+            # the whole utterance, flushed at the end
+            encoder = self._new_lame_encoder(sample_rate)
+            for piece in pieces:
+                future = self._scheduler.submit(piece, speaker_id, speed)
+                audio = future.result(timeout=120)
+                chunk = encoder.encode(self._to_int16(audio).tobytes())
+                if chunk:
+                    yield bytes(chunk)
+            tail = encoder.flush()
+            if tail:
+                yield bytes(tail)
+            return
+
+        # One long-lived ffmpeg process encodes float PCM to MP3 as it
+        # arrives on stdin; a reader thread drains stdout so the pipe
+        # never deadlocks
+        proc = subprocess.Popen(
+            ['ffmpeg', '-v', 'quiet',
+             '-f', 'f32le', '-ar', str(sample_rate), '-ac', '1', '-i', 'pipe:0',
+             '-b:a', '192k', '-f', 'mp3', 'pipe:1'],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE
+        )
+
+        encoded = queue.Queue()
+
+        def _drain_stdout():
+            while True:
+                chunk = proc.stdout.read(8192)
+                if not chunk:
+                    break
+                encoded.put(chunk)
+            encoded.put(None)
+
+        reader = threading.Thread(target=_drain_stdout, daemon=True)
+        reader.start()
+
+        try:
+            for piece in pieces:
+                future = self._scheduler.submit(piece, speaker_id, speed)
+                audio = future.result(timeout=120)
+                proc.stdin.write(audio.astype(np.float32).tobytes())
+                proc.stdin.flush()
+
+                # Yield whatever the encoder has produced so far
+                while True:
+                    try:
+                        chunk = encoded.get_nowait()
+                    except queue.Empty:
+                        break
+                    if chunk is None:
+                        return
+                    yield chunk
+
+            # Flush the encoder and drain the remaining output
+            proc.stdin.close()
+            while True:
+                chunk = encoded.get()
+                if chunk is None:
+                    break
+                yield chunk
+        except Exception as e:
+            raise TTSError(f"Failed to stream speech: {e}")
         finally:
-            # Clean up temp files
-            if tmp_wav_path and os.path.exists(tmp_wav_path):
-                os.unlink(tmp_wav_path)
-            if tmp_mp3_path and os.path.exists(tmp_mp3_path):
-                os.unlink(tmp_mp3_path)
-    
+            # Also reached via GeneratorExit when the client disconnects
+            # mid-stream: close stdin so ffmpeg cannot block reading
+            # pipe:0, and kill it if it is still running, otherwise
+            # wait() would hang and leak this worker thread
+            try:
+                proc.stdin.close()
+            except OSError:
+                pass
+            if proc.poll() is None:
+                proc.kill()
+            proc.wait()
+            reader.join(timeout=5)
+
     def shutdown(self):
         """Cleanup resources"""
-        # Clear model from memory
+        # Stop the batch scheduler thread
+        if self._scheduler is not None:
+            self._scheduler.shutdown()
+            self._scheduler = None
+
+        # Clear model and caches from memory
         self._model = None
         self._speaker_ids = None
         self._speakers = None
         self._voices = None
+        self._voice_labels = None
+        with self._audio_cache_lock:
+            self._audio_cache.clear()
+            self._audio_cache_bytes = 0
     
     def __enter__(self):
         """Context manager entry"""
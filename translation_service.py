@@ -4,27 +4,60 @@ Uses googletrans (primary) with deep-translator fallback.
 Optimized with caching and lazy initialization.
 """
 
-import concurrent.futures
 import asyncio
-from typing import Optional, Tuple
+import os
+import queue
+import re
+import unicodedata
+from typing import List, Optional, Tuple
 from functools import lru_cache
 from deep_translator import GoogleTranslator
 from googletrans import Translator
 
+try:
+    from diskcache import Cache
+    DISKCACHE_AVAILABLE = True
+except ImportError:
+    DISKCACHE_AVAILABLE = False
+    print("Warning: diskcache not available, using in-process translation cache")
+
 class TranslationService:
     """Hybrid Thai-Chinese Translation Service with Caching"""
     
     SHORT_TEXT_THRESHOLD = 200  # Characters: use googletrans below, deep-translator above
-    CACHE_SIZE = 100  # Maximum cached translations
-    
+    CACHE_SIZE = 1024  # Maximum cached translations (in-process fallback)
+    POOL_SIZE = 4  # Pre-warmed googletrans instances
+    MAX_CONCURRENT_TRANSLATIONS = 8  # Concurrent outbound calls from async callers
+    DISK_CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.tx_cache')
+    DISK_CACHE_SIZE_LIMIT = 100 << 20  # 100 MB
+
     def __init__(self):
         """Initialize translation service"""
         self._deep_translator = None  # Lazy initialization
-        self._executor = None  # Lazy initialization
-        self._future: Optional[concurrent.futures.Future] = None
-        
-        # Create cached translation method
-        self._cached_translate = lru_cache(maxsize=self.CACHE_SIZE)(self._translate_impl)
+        self._translator_pool = None  # Lazy initialization
+        self._semaphore: Optional[asyncio.Semaphore] = None  # Lazy initialization
+
+        # Create cached translation method: an on-disk cache shared
+        # across workers and surviving restarts when diskcache is
+        # available, an in-process lru_cache otherwise
+        if DISKCACHE_AVAILABLE:
+            self._disk_cache = Cache(
+                self.DISK_CACHE_DIR, size_limit=self.DISK_CACHE_SIZE_LIMIT
+            )
+            self._cached_translate = self._translate_disk_cached
+        else:
+            self._disk_cache = None
+            self._cached_translate = lru_cache(maxsize=self.CACHE_SIZE)(self._translate_impl)
+
+    def _translate_disk_cached(self, key: str) -> Tuple[str, str]:
+        """Translate with the shared on-disk cache (SQLite WAL, process-safe)"""
+        try:
+            return self._disk_cache[key]
+        except KeyError:
+            pass
+        result = self._translate_impl(key)
+        self._disk_cache[key] = result
+        return result
 
     @property
     def deep_translator(self):
@@ -34,23 +67,32 @@ class TranslationService:
         return self._deep_translator
     
     @property
-    def executor(self):
-        """Lazy initialization of thread pool executor"""
-        if self._executor is None:
-            self._executor = concurrent.futures.ThreadPoolExecutor(max_workers=1)
-        return self._executor
-    
+    def translator_pool(self):
+        """Lazy initialization of the pre-warmed googletrans instance pool"""
+        if self._translator_pool is None:
+            pool = queue.Queue()
+            for _ in range(self.POOL_SIZE):
+                pool.put(Translator())
+            self._translator_pool = pool
+        return self._translator_pool
+
     def _translate_google_sync(self, text: str) -> str:
         """
         Wrapper to run googletrans synchronously.
+
+        Borrows a pre-warmed Translator from the pool so each call reuses
+        an existing HTTP session instead of paying a fresh TLS handshake
+        and token fetch; the pool also keeps each instance single-threaded.
         """
+        pool = self.translator_pool
+        translator = pool.get()
         try:
-            # Instantiate here to avoid thread safety issues
-            translator = Translator()
             result = translator.translate(text, src='th', dest='zh-cn')
             return result.text
         except Exception as e:
             raise RuntimeError(f"Googletrans error: {str(e)}")
+        finally:
+            pool.put(translator)
 
     def _translate_impl(self, text: str) -> Tuple[str, str]:
         """
@@ -86,44 +128,66 @@ class TranslationService:
                 except Exception as ex:
                      raise TranslationError(f"All translators failed: {ex}")
     
+    @staticmethod
+    def _normalize(text: str) -> str:
+        """
+        Canonicalize text for cache lookups: Unicode NFC, collapsed
+        whitespace, trailing punctuation stripped. Trivial variants
+        ("สวัสดี", "สวัสดี ", "สวัสดี\\n") then share one cache entry.
+        """
+        text = unicodedata.normalize('NFC', text)
+        text = re.sub(r'\s+', ' ', text)
+        return text.strip(' \t\n.!?。！？')
+
     def translate(self, text: str) -> Tuple[str, str]:
         """
         Translate Thai text to Chinese using hybrid approach with caching.
         Returns: (translated_text, translator_used)
         """
-        text = text.strip()
-        if not text:
+        key = self._normalize(text)
+        if not key:
             return "", "none"
-        
+
         # Use cached implementation
-        return self._cached_translate(text)
+        return self._cached_translate(key)
+
+    def cached_translations(self, limit: int = 128) -> List[str]:
+        """
+        Chinese outputs stored in the persistent cache, up to `limit`.
+        Empty when only the in-process cache is in use.
+        """
+        if self._disk_cache is None:
+            return []
+        results = []
+        for key in self._disk_cache:
+            value = self._disk_cache.get(key)
+            if value:
+                results.append(value[0])
+            if len(results) >= limit:
+                break
+        return results
+
+    async def atranslate(self, text: str) -> Tuple[str, str]:
+        """
+        Async translate for event-loop callers. Up to
+        MAX_CONCURRENT_TRANSLATIONS calls run concurrently, each
+        offloaded to a thread (googletrans 4.0.0-rc1 is sync); unlike
+        the old single-worker executor there is no 1-deep queue.
+        Returns: (translated_text, translator_used)
+        """
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.MAX_CONCURRENT_TRANSLATIONS)
+        async with self._semaphore:
+            return await asyncio.to_thread(self.translate, text)
 
-    def translate_async(self, text: str) -> None:
-        """Start translation in background thread"""
-        self._future = self.executor.submit(self.translate, text)
-    
-    def get_translation_result(self, timeout: float = 30.0) -> Tuple[str, str]:
-        """Get result from background translation."""
-        if self._future is None:
-            raise TranslationError("No translation in progress")
-        
-        try:
-            return self._future.result(timeout=timeout)
-        except concurrent.futures.TimeoutError:
-            raise TranslationError("Translation timed out")
-        except Exception as e:
-            raise TranslationError(f"Translation failed: {e}")
-    
-    def is_translation_done(self) -> bool:
-        """Check if background translation is complete"""
-        return self._future is not None and self._future.done()
-    
     def shutdown(self):
-        """Cleanup executor and clear cache"""
-        if self._executor:
-            self._executor.shutdown(wait=False)
-        # Clear translation cache
-        self._cached_translate.cache_clear()
+        """Cleanup cache resources"""
+        if self._disk_cache is not None:
+            # Persistent by design: close, don't clear
+            self._disk_cache.close()
+        else:
+            # Clear in-process translation cache
+            self._cached_translate.cache_clear()
     
     def __enter__(self):
         """Context manager entry"""
@@ -136,6 +200,11 @@ class TranslationService:
     
     def get_cache_info(self):
         """Get cache statistics"""
+        if self._disk_cache is not None:
+            return {
+                'entries': len(self._disk_cache),
+                'volume_bytes': self._disk_cache.volume()
+            }
         return self._cached_translate.cache_info()
 
 